@@ -0,0 +1,20 @@
+"""
+Optional Numba support. Numba is not a required dependency, so when it is not
+installed njit leaves functions as plain Python and callers should prefer their
+NumPy implementation.
+"""
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        Stand-in for numba.njit which returns the function unchanged.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -1,11 +1,193 @@
 """Module to perform annuity calculations"""
 
+import math
+from dataclasses import dataclass
+from typing import Optional
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+from dkrk._numba import NUMBA_AVAILABLE, njit
 
-pd.set_option("display.max_rows", 1000)
-pd.set_option("display.float_format", lambda x: "%.3f" % x)
+
+def configure_display():
+    """
+    Set pandas display options suitable for showing amortization tables, i.e.
+    all rows of a 30 year monthly loan and amounts with three decimals. This
+    changes global pandas options, so it is not done on import.
+    """
+    pd.set_option("display.max_rows", 1000)
+    pd.set_option("display.float_format", lambda x: "%.3f" % x)
+
+
+def _annuity_payment(principal: float, rate: float, n_payments: int) -> float:
+    """
+    The annuity p*r*g/(g-1) with g = (1+r)**n. g-1 is computed with expm1 and
+    log1p to keep precision for small rates, and a first order expansion in r is
+    used for rates close to zero.
+    """
+    if abs(rate) < 1e-10:
+        return principal * (1 / n_payments + rate * (n_payments + 1) / (2 * n_payments))
+    growth_m1 = math.expm1(n_payments * math.log1p(rate))
+    return principal * rate * (growth_m1 + 1.0) / growth_m1
+
+
+# Compiled for use in _fill_annuity_arrays_loop. Plain Python is faster for a
+# single call, since it avoids the dispatch overhead of Numba.
+_annuity_payment_jit = njit(cache=True)(_annuity_payment)
+
+# Element-wise _annuity_payment for arrays of principals or rates
+_annuity_payment_array = np.vectorize(_annuity_payment, otypes=[np.float64])
+
+
+@njit(cache=True, fastmath=True)
+def _fill_annuity_arrays_loop(
+    principal: float,
+    rate: float,
+    annuity: np.ndarray,
+    repayment: np.ndarray,
+    debt: np.ndarray,
+    interest: np.ndarray,
+):
+    """
+    Write annuity, repayment, debt and interest for each term into the given
+    arrays in a single pass. Compiled with Numba when it is available.
+    """
+    n_payments = len(annuity)
+    annuity_val = _annuity_payment_jit(principal, rate, n_payments)
+    cur_repayment = annuity_val - principal * rate
+    cur_debt = principal
+    for i in range(n_payments):
+        cur_debt -= cur_repayment
+        annuity[i] = annuity_val
+        repayment[i] = cur_repayment
+        debt[i] = cur_debt
+        interest[i] = annuity_val - cur_repayment
+        cur_repayment *= 1 + rate
+
+
+def _fill_annuity_arrays_numpy(
+    principal: float,
+    rate: float,
+    annuity: np.ndarray,
+    repayment: np.ndarray,
+    debt: np.ndarray,
+    interest: np.ndarray,
+):
+    """
+    Write annuity, repayment, debt and interest for each term into the given
+    arrays using in-place NumPy operations.
+    """
+    n_payments = len(annuity)
+    annuity[:] = Annuity.calc_annuity(principal, rate, n_payments)
+
+    # Repayments grow geometrically: a1 * (1 + r)**(term - 1)
+    a1 = annuity[0] - principal * rate
+    np.power(1 + rate, np.arange(n_payments), out=repayment)
+    repayment *= a1
+
+    np.cumsum(repayment, out=debt)
+    np.subtract(principal, debt, out=debt)
+    np.subtract(annuity, repayment, out=interest)
+
+
+_fill_annuity_arrays = (
+    _fill_annuity_arrays_loop if NUMBA_AVAILABLE else _fill_annuity_arrays_numpy
+)
+
+
+def _annuity_arrays(principal: float, rate: float, n_payments: int):
+    """
+    Annuity, repayment, debt and interest for each term, as rows of a single
+    preallocated array.
+    """
+    arrays = np.empty((4, n_payments))
+    _fill_annuity_arrays(principal, rate, *arrays)
+    annuity, repayment, debt, interest = arrays
+    return annuity, repayment, debt, interest
+
+
+def _annuity_arrays_grid(principal: np.ndarray, rate: np.ndarray, n_payments: int):
+    """
+    Annuity, repayment, debt and interest for many loans at once. principal and
+    rate are 1-D arrays with one element per loan, and each returned array has
+    shape (n_loans, n_payments).
+    """
+    principal = principal[:, None]
+    rate = rate[:, None]
+
+    annuity_val = Annuity.calc_annuity(principal, rate, n_payments)
+    annuity = np.broadcast_to(annuity_val, (len(principal), n_payments))
+
+    # Repayments grow geometrically: a1 * (1 + r)**(term - 1)
+    a1 = annuity_val - principal * rate
+    repayment = a1 * (1 + rate) ** np.arange(n_payments)
+    debt = principal - np.cumsum(repayment, axis=1)
+    interest = annuity - repayment
+
+    return annuity, repayment, debt, interest
+
+
+def _set_read_only(amort_table: "AmortTable"):
+    """
+    Make the arrays of an amortization table read-only. Used by loans for the
+    tables they create, since they cache values calculated from them.
+    """
+    for arr in (
+        amort_table.annuity,
+        amort_table.repayment,
+        amort_table.interest,
+        amort_table.debt,
+        amort_table.bidrag,
+    ):
+        if arr is not None:
+            arr.flags.writeable = False
+
+
+@dataclass(frozen=True, eq=False)
+class AmortTable:
+    """
+    Amortization of a loan, with one element per term in each array. Use
+    to_dataframe to get it as a table. bidrag is only set for loans with bidrag,
+    e.g. dkrk.realestate.TKLoan.
+
+    Use dataclasses.replace to derive an adjusted table.
+    """
+
+    annuity: np.ndarray
+    repayment: np.ndarray
+    interest: np.ndarray
+    debt: np.ndarray
+    bidrag: Optional[np.ndarray] = None
+
+    def to_dataframe(self, dtype=np.float64) -> pd.DataFrame:
+        """
+        Table showing annuities and amortization, indexed by Time starting at 1.
+        The table holds a copy of the arrays, so editing it does not affect them.
+
+        Parameters
+        ----------
+        dtype : np.dtype
+            The dtype of the table. E.g. np.float32 halves the memory used when
+            comparing many loans.
+        """
+        columns = {
+            "Annuity": self.annuity,
+            "Repayment": self.repayment,
+            "Interest": self.interest,
+            "Debt": self.debt,
+        }
+        if self.bidrag is not None:
+            columns["Bidrag"] = self.bidrag
+        # Copy all columns into one block, which pandas then uses without copying
+        values = np.empty((len(columns), len(self.annuity)), dtype=dtype)
+        for row, arr in zip(values, columns.values()):
+            row[:] = arr
+        return pd.DataFrame(
+            values.T,
+            index=pd.RangeIndex(1, len(self.annuity) + 1, name="Time"),
+            columns=list(columns),
+            copy=False,
+        )
 
 
 class Annuity:
@@ -25,7 +207,14 @@ class Annuity:
         but payments are made each quarter.
     """
 
-    def __init__(self, principal: float, interest: float, maturity: int, n_terms: int):
+    def __init__(
+        self,
+        principal: float,
+        interest: float,
+        maturity: int,
+        n_terms: int,
+        dtype=np.float64,
+    ):
         """
         Parameters
         ----------
@@ -39,14 +228,27 @@ class Annuity:
             The number of payments made for each term. E.g. if the loan is for 30 years
             and payments are made each quarter, then n_paymens should 4. NB: It is not
             the total number of payments made during the lifetime of the annuity!
+        dtype : np.dtype
+            The dtype of the amortization table. E.g. np.float32 halves the memory
+            used when comparing many loans. Calculations are done in float64.
         """
         self.principal = principal
         self.interest = interest
         self.maturity = maturity
         self.n_terms = n_terms
-        self.table = Annuity.calc_annuity_table(
+        self.dtype = dtype
+        self.amort_table = Annuity.calc_amort_table(
             self.principal, self.interest, self.maturity, self.n_terms
         )
+        _set_read_only(self.amort_table)
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """
+        Table showing annuities and amortization. A new table is created on each
+        access, so editing it does not affect the loan.
+        """
+        return self.amort_table.to_dataframe(self.dtype)
 
     @staticmethod
     def repayment(principal: float, interest: float, maturity: int, term: int):
@@ -67,12 +269,52 @@ class Annuity:
             NB: The first term of repayment is term=1, thus dont use term=0.
         """
         assert term > 0, "Cannot set term < 1"
-        a1 = principal * interest / ((1 + interest) ** maturity - 1)
+        # The first repayment is the annuity minus interest on the full principal
+        a1 = Annuity.calc_annuity(principal, interest, maturity) - principal * interest
         return a1 * (1 + interest) ** (term - 1)
 
+    @staticmethod
+    def calc_amort_table(
+        principal: float,
+        interest: float,
+        maturity: int,
+        n_terms: int,
+    ) -> AmortTable:
+        """
+        Calculate annuity, repayment, interest and debt for each time period.
+
+        Parameters
+        ----------
+        principal : float
+            The principal of the loan
+        interest : float
+            The interest rate of the loan, as a decimal. E.g. 5% would be 0.05
+        maturity : int
+            The time to maturity. E.g. 30 for 30 years
+        n_terms : int
+            The number of payments made for each term. E.g. if the loan is for 30 years
+            and payments are made each quarter, then n_paymens should 4. NB: It is not
+            the total number of payments made during the lifetime of the annuity!
+
+        Returns
+        -------
+        AmortTable
+            Arrays showing annuities and amortization
+        """
+        annuity, repayment, debt, interest_paid = _annuity_arrays(
+            principal, interest / n_terms, maturity * n_terms
+        )
+        return AmortTable(
+            annuity=annuity, repayment=repayment, interest=interest_paid, debt=debt
+        )
+
     @staticmethod
     def calc_annuity_table(
-        principal: float, interest: float, maturity: int, n_terms: int
+        principal: float,
+        interest: float,
+        maturity: int,
+        n_terms: int,
+        dtype=np.float64,
     ) -> pd.DataFrame:
         """
         Create an annuity table showing amortization, repayment and interest
@@ -90,41 +332,25 @@ class Annuity:
             The number of payments made for each term. E.g. if the loan is for 30 years
             and payments are made each quarter, then n_paymens should 4. NB: It is not
             the total number of payments made during the lifetime of the annuity!
+        dtype : np.dtype
+            The dtype of the table. E.g. np.float32 halves the memory used when
+            comparing many loans. Calculations are done in float64.
 
         Returns
         -------
         pd.DataFrame
-            Table showing annuities and amortization
+            Table showing annuities and amortization, indexed by Time starting at 1
         """
-        df = pd.DataFrame(
-            np.zeros((maturity * n_terms, 4)),
-            columns=["Time", "Annuity", "Repayment", "Interest"],
-        )
-        df["Time"] = np.arange(1, (maturity * n_terms) + 1)
-
-        df["Annuity"] = Annuity.calc_annuity(
-            principal, interest / n_terms, maturity * n_terms
-        )
-
-        df["Repayment"] = np.array(
-            [
-                Annuity.repayment(
-                    principal, interest / n_terms, maturity * n_terms, term
-                )
-                for term in range(1, (maturity * n_terms) + 1)
-            ]
-        )
-        df["Debt"] = principal - df["Repayment"].cumsum()
-        df["Interest"] = df["Annuity"] - df["Repayment"]
-
-        return df
+        return Annuity.calc_amort_table(
+            principal, interest, maturity, n_terms
+        ).to_dataframe(dtype)
 
     @property
     def annuity(self) -> float:
         """
         Annuity which should be repaid each term.
         """
-        return self.annuity(
+        return Annuity.calc_annuity(
             self.principal,
             self.interest / self.n_terms,
             self.maturity * self.n_terms,
@@ -133,34 +359,36 @@ class Annuity:
     @staticmethod
     def calc_annuity(principal: float, interest: float, maturity: int) -> float:
         """
-        Calculate the annuity which should be repaid each term.
+        Calculate the annuity which should be repaid each term. principal and
+        interest may also be arrays, which gives an array of annuities.
 
         Parameters
         ----------
-        principal : float
+        principal : float or np.ndarray
             The principal of the loan
-        interest : float
+        interest : float or np.ndarray
             The interest rate of the loan, as a decimal. E.g. 5% would be 0.05
         maturity : int
             The time to maturity. E.g. 30 for 30 years
 
         Returns
         -------
-        float
+        float or np.ndarray
             Annuity
         """
-        return principal * interest * (1 / (1 - (1 + interest) ** (-maturity)))
+        if np.isscalar(interest):
+            return _annuity_payment(principal, interest, maturity)
+        return _annuity_payment_array(principal, interest, maturity)
 
     def plot(self):
         """
         Create a plot visualizing the amortization of the loan
         """
+        table = self.table
         fig = go.Figure(
             data=[
-                go.Bar(
-                    name="Repayment", x=self.table["Time"], y=self.table["Repayment"]
-                ),
-                go.Bar(name="Interest", x=self.table["Time"], y=self.table["Interest"]),
+                go.Bar(name="Repayment", x=table.index, y=table["Repayment"]),
+                go.Bar(name="Interest", x=table.index, y=table["Interest"]),
             ]
         )
         # Change the bar mode
@@ -186,11 +414,11 @@ class Annuity:
         """
         The total cost of the loan, which is the sum of all annuities
         """
-        return self.table["Annuity"].sum()
+        return self.amort_table.annuity.sum()
 
     @property
     def total_interest(self) -> float:
         """
         The total interest paid on the loan during the whole lifetime
         """
-        return self.table["Interest"].sum()
+        return self.amort_table.interest.sum()
@@ -2,16 +2,34 @@
 Module handling calculations related to Danish Real Estate Loans
 """
 from abc import ABC, abstractmethod
+from bisect import bisect_right
+from dataclasses import replace
+from calendar import monthrange
 from enum import Enum
-from dkrk.annuity import Annuity
+from functools import cached_property
+from typing import List
+from dkrk.annuity import AmortTable, Annuity, _annuity_arrays_grid, _set_read_only
+from dkrk._numba import NUMBA_AVAILABLE, njit
 import pandas as pd
 import numpy as np
-from numpy.polynomial.polynomial import polyroots
 import plotly.express as px
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
 
+def _add_months(date: datetime, months: int) -> datetime:
+    """
+    Add a number of months to a date. As with relativedelta, the day is clamped
+    to the last day of the resulting month.
+    """
+    year, month = divmod(date.month - 1 + months, 12)
+    year += date.year
+    month += 1
+    return date.replace(
+        year=year, month=month, day=min(date.day, monthrange(year, month)[1])
+    )
+
+
 class Term(ABC):
     def __init__(self, start: datetime, end: datetime):
         self.start = start
@@ -24,16 +42,12 @@ class Term(ABC):
 
 class Month(Term):
     def next_term(self):
-        return Month(
-            self.start + relativedelta(months=1), self.end + relativedelta(months=1)
-        )
+        return Month(_add_months(self.start, 1), _add_months(self.end, 1))
 
 
 class Quarter(Term):
     def next_term(self):
-        return Month(
-            self.start + relativedelta(months=3), self.end + relativedelta(months=3)
-        )
+        return Quarter(_add_months(self.start, 3), _add_months(self.end, 3))
 
 class TKDueDate(Enum):
     march = (3, 31)
@@ -42,6 +56,8 @@ class TKDueDate(Enum):
     december = (12, 31)
 
 
+_TK_DUE_DAYS = sorted(due_date.value for due_date in TKDueDate)
+
 
 class Maturity:
 
@@ -61,32 +77,238 @@ class Maturity:
 
     @staticmethod
     def next_due_date(date: datetime) -> datetime:
-        cur_year = date.year
-        for due_month in TKDueMonth:
-            loop_due = datetime(cur_year, due_month.value[0], due_month.value[1])
-            if date < loop_due:
-                break
-        
-        return loop_due 
+        """
+        The first due date after the given date.
+        """
+        idx = bisect_right(_TK_DUE_DAYS, (date.month, date.day))
+        if idx == len(_TK_DUE_DAYS):
+            return datetime(date.year + 1, *_TK_DUE_DAYS[0])
+        return datetime(date.year, *_TK_DUE_DAYS[idx])
 
     def due_dates(self) -> List[datetime]:
-        res = []
-        cur_date = self.date.copy()
+        """
+        All due dates after the current date up to and including maturity.
+        """
         end_date = self.date + self.time_to_maturity
-        while cur_date <= end_date:
-            tmp_due = Maturity.next_due_date(cur_date)
-            if tmp_due <= end_date:
-                res.append(
-                    tmp_due
-                )
-            else:
+        # Due dates of TKDueDate are the calendar quarter ends
+        dues = pd.date_range(
+            self.date,
+            end_date,
+            freq=pd.offsets.QuarterEnd(startingMonth=12),
+            normalize=True,
+        ).to_pydatetime()
+        return [due for due in dues if due > self.date]
+
+
+def _annuity_yield_guess(principal: float, payment: float, n_payments: int) -> float:
+    """
+    First order approximation of the rate at which n_payments level payments
+    repay the principal, used as starting point for Newton iteration.
+    """
+    return 2 * (payment * n_payments / principal - 1) / (n_payments + 1)
+
+
+def _annuity_yield(
+    principal: float,
+    payment: float,
+    n_payments: int,
+    guess: float = None,
+    tol: float = 1e-12,
+    max_iter: int = 50,
+) -> float:
+    """
+    Solve principal = payment * (1 - (1 + y)**(-n)) / y for the rate y using
+    Newton iteration with the analytic derivative. Each step is O(1), regardless
+    of the number of payments. If no guess is given, the first order
+    approximation from _annuity_yield_guess is used. Returns NaN if the iteration
+    does not converge to a rate above -1.
+    """
+    if abs(payment * n_payments - principal) <= 1e-12 * abs(principal):
+        return 0.0
+    if guess is None:
+        guess = _annuity_yield_guess(principal, payment, n_payments)
+    rate = guess
+    for _ in range(max_iter):
+        if rate == 0:
+            # The formula is undefined at zero, so start just next to it
+            rate = 1e-6
+        discount = (1 + rate) ** (-n_payments)
+        value = payment * (1 - discount) / rate - principal
+        deriv = (
+            -payment * (1 - discount) / rate**2
+            + payment * n_payments * discount / ((1 + rate) * rate)
+        )
+        step = value / deriv
+        rate -= step
+        if not -1 < rate < np.inf:
+            return np.nan
+        if abs(step) < tol:
+            return rate
+    return np.nan
+
+
+@njit(cache=True, fastmath=True)
+def _horner_loop(coeffs: np.ndarray, x: float):
+    """
+    Value and derivative of the polynomial sum(coeffs[i] * x**i) at x, evaluated
+    together in a single Horner pass. Compiled with Numba when it is available.
+    """
+    value = 0.0
+    deriv = 0.0
+    for i in range(len(coeffs) - 1, -1, -1):
+        deriv = deriv * x + value
+        value = value * x + coeffs[i]
+    return value, deriv
+
+
+def _horner_numpy(coeffs: np.ndarray, x: float):
+    """
+    Value and derivative of the polynomial sum(coeffs[i] * x**i) at x, evaluated
+    with NumPy.
+    """
+    powers = x ** np.arange(len(coeffs))
+    value = coeffs @ powers
+    deriv = (np.arange(1, len(coeffs)) * coeffs[1:]) @ powers[:-1]
+    return value, deriv
+
+
+_horner = _horner_loop if NUMBA_AVAILABLE else _horner_numpy
+
+
+def _newton_discount(
+    coeffs: np.ndarray,
+    x0: float,
+    lo: float = 0.0,
+    hi: float = 2.0,
+    tol: float = 1e-14,
+    max_iter: int = 50,
+) -> float:
+    """
+    Find the root x in (lo, hi) of the polynomial sum(coeffs[i] * x**i), where x
+    is the discount factor 1 / (1 + y) of a cash flow. Newton steps are used
+    while they stay inside the bracket around the root, otherwise the bracket
+    is bisected. Returns NaN if the root is not bracketed or not found.
+    """
+    # Numba dispatch is much slower when arguments are left to their defaults,
+    # so all of them are passed on to the compiled function
+    return _newton_discount_loop(
+        coeffs, float(x0), float(lo), float(hi), float(tol), int(max_iter)
+    )
+
+
+@njit(cache=True)
+def _newton_discount_loop(
+    coeffs: np.ndarray, x0: float, lo: float, hi: float, tol: float, max_iter: int
+) -> float:
+    """
+    Implementation of _newton_discount. Compiled with Numba when it is available.
+    """
+    value_lo = _horner(coeffs, lo)[0]
+    value_hi = _horner(coeffs, hi)[0]
+    if value_lo * value_hi > 0:
+        return np.nan
+    # Keep the polynomial negative at lo and positive at hi
+    if value_lo > 0:
+        lo, hi = hi, lo
+
+    x = x0 if min(lo, hi) < x0 < max(lo, hi) else (lo + hi) / 2
+    for _ in range(max_iter):
+        value, deriv = _horner(coeffs, x)
+        if value == 0:
+            return x
+        if value < 0:
+            lo = x
+        else:
+            hi = x
+        x_new = x - value / deriv if deriv != 0 else lo
+        if not min(lo, hi) <= x_new <= max(lo, hi):
+            x_new = (lo + hi) / 2
+        if abs(x_new - x) < tol:
+            return x_new
+        x = x_new
+    return np.nan
+
+
+def _poly_roots(coeffs: np.ndarray) -> np.ndarray:
+    """
+    Roots of the polynomial sum(coeffs[i] * x**i). Polynomials of degree two or
+    less are solved in closed form, others by np.roots, which takes the
+    coefficients in descending order and computes the eigenvalues of the
+    companion matrix directly.
+    """
+    coeffs = np.trim_zeros(coeffs, "b")
+    degree = len(coeffs) - 1
+    if degree < 1:
+        return np.empty(0)
+    if degree == 1:
+        return np.array([-coeffs[0] / coeffs[1]])
+    if degree == 2:
+        c0, c1, c2 = coeffs
+        # Avoids cancellation between -c1 and the square root
+        q = -(c1 + np.copysign(1, c1) * np.emath.sqrt(c1**2 - 4 * c2 * c0)) / 2
+        if q == 0:
+            return np.zeros(2)
+        return np.array([q / c2, c0 / q])
+    return np.roots(coeffs[::-1])
+
+
+def _polyroots_yield(flow: np.ndarray) -> float:
+    """
+    Find the rate of a cash flow from all roots of its polynomial. Slow, but
+    useful to validate the result of Newton iteration.
+
+    Rounding errors in the eigensolver can give real roots a tiny imaginary
+    part, so roots are treated as real within a relative tolerance. If several
+    positive real roots exist, the discount factor closest to 1 (the rate
+    closest to 0) is used.
+    """
+    roots = np.asarray(_poly_roots(flow), dtype=np.complex128)
+    is_real = np.abs(roots.imag) <= 1e-8 * np.maximum(np.abs(roots), 1)
+    real_roots = roots.real[is_real]
+    positive_roots = real_roots[real_roots > 0]
+    if len(positive_roots) == 0:
+        raise ValueError("The cash flow has no positive real discount factor")
+
+    discount = positive_roots[np.argmin(np.abs(positive_roots - 1))]
+    return 1 / discount - 1
+
+
+def _newton_discount_grid(
+    flows: np.ndarray, x0: np.ndarray, tol: float = 1e-12, max_iter: int = 50
+) -> np.ndarray:
+    """
+    Newton iteration on the cash flow polynomial of each row of flows in lock
+    step, solving for the discount factors x = 1 / (1 + y). Each iteration is a
+    single Horner pass over the columns. Rows which do not converge to a positive
+    discount factor are set to NaN.
+    """
+    x = np.array(x0, dtype=np.float64)
+    converged = np.zeros(len(x), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(max_iter):
+            value = np.zeros(len(x))
+            deriv = np.zeros(len(x))
+            for coeff in flows.T[::-1]:
+                deriv = deriv * x + value
+                value = value * x + coeff
+            step = value / deriv
+            x = np.where(converged, x, x - step)
+            converged |= np.abs(step) < tol
+            if converged.all():
                 break
-        
-        return res
+    x[~converged | ~(x > 0)] = np.nan
+    return x
+
 
 class TKLoan:
     """
     A loan from Total Kredit, which has quarterly amortization.
+
+    yield_to_maturity, total_cost and total_interest are calculated on first
+    access and then cached, so a loan should not be modified after it is created.
+    The amortization arrays and the cash flow are read-only to enforce this.
+    Create a new loan to change its parameters. table creates a new copy of the
+    arrays on each access, so editing it does not affect the loan.
     """
 
     def __init__(
@@ -96,6 +318,7 @@ class TKLoan:
         bidrag: float,
         maturity: int = 30,
         n_terms: int = 4,
+        dtype=np.float64,
     ):
         """
         Parameters
@@ -113,6 +336,9 @@ class TKLoan:
             The number of payments made for each term. E.g. if the loan is for 30 years
             and payments are made each quarter, then n_paymens should 4. NB: It is not
             the total number of payments made during the lifetime of the annuity!
+        dtype : np.dtype
+            The dtype of the amortization table. E.g. np.float32 halves the memory
+            used when comparing many loans. Calculations are done in float64.
 
         """
         self.face_value = face_value
@@ -120,15 +346,22 @@ class TKLoan:
         self.bidrag = bidrag
         self.maturity = maturity
         self.n_terms = n_terms
+        self.dtype = dtype
 
         # Calc annuity
         self.annuity_obj = Annuity(
-            self.face_value, self.interest, self.maturity, self.n_terms
+            self.face_value, self.interest, self.maturity, self.n_terms, dtype
         )
-        self.table = self._add_bidrag(self.annuity_obj.table, self.bidrag, self.n_terms)
+        self.amort_table = self._add_bidrag(
+            self.annuity_obj.amort_table, self.bidrag, self.n_terms
+        )
+        _set_read_only(self.amort_table)
 
         # Cash flow
-        self.cash_flow = [-self.face_value] + self.table["Annuity"].values.tolist()
+        self.cash_flow = np.empty(len(self.amort_table.annuity) + 1)
+        self.cash_flow[0] = -self.face_value
+        self.cash_flow[1:] = self.amort_table.annuity
+        self.cash_flow.flags.writeable = False
     
     @classmethod
     def from_price(cls,
@@ -138,6 +371,7 @@ class TKLoan:
         bidrag: float,
         maturity: int = 30,
         n_terms: int = 4,
+        dtype=np.float64,
     ):
         """
         Create a new loan with a desired size. E.g. you want to borrow 1000000
@@ -161,6 +395,9 @@ class TKLoan:
             The number of payments made for each term. E.g. if the loan is for 30 years
             and payments are made each quarter, then n_paymens should 4. NB: It is not
             the total number of payments made during the lifetime of the annuity!
+        dtype : np.dtype
+            The dtype of the amortization table. E.g. np.float32 halves the memory
+            used when comparing many loans. Calculations are done in float64.
 
         """
 
@@ -173,18 +410,142 @@ class TKLoan:
             interest,
             bidrag,
             maturity,
-            n_terms
+            n_terms,
+            dtype
+        )
+
+    @classmethod
+    def from_grid(
+        cls,
+        face_values,
+        interests,
+        bidrags,
+        maturity: int = 30,
+        n_terms: int = 4,
+    ) -> pd.DataFrame:
+        """
+        Calculate yield to maturity, total cost and total interest for many loans
+        at once, without creating a TKLoan for each of them. face_values,
+        interests and bidrags are broadcast against each other, so e.g. a range
+        of interest rates can be compared for a single face value.
+
+        Parameters
+        ----------
+        face_values : array_like
+            The sizes of the loans
+        interests : array_like
+            The interest rates of the loans, as decimals. E.g. 5% would be 0.05
+        bidrags : array_like
+            Bidrag is interest paid to the bank. Should be annual interest.
+        maturity : int
+            The time to maturity. E.g. 30 for 30 years
+        n_terms : int
+            The number of payments made for each term. E.g. if the loan is for 30 years
+            and payments are made each quarter, then n_paymens should 4. NB: It is not
+            the total number of payments made during the lifetime of the annuity!
+
+        Returns
+        -------
+        pd.DataFrame
+            One row for each loan with its inputs, yield to maturity, total cost
+            and total interest
+        """
+        face_values, interests, bidrags = (
+            arr.ravel()
+            for arr in np.broadcast_arrays(
+                np.asarray(face_values, dtype=np.float64),
+                np.asarray(interests, dtype=np.float64),
+                np.asarray(bidrags, dtype=np.float64),
+            )
+        )
+        n_payments = maturity * n_terms
+
+        annuity, repayment, debt, interest = _annuity_arrays_grid(
+            face_values, interests / n_terms, n_payments
+        )
+        bidrag_paid = np.add(repayment, debt)
+        bidrag_paid *= bidrags[:, None] / n_terms
+
+        flows = np.empty((len(face_values), n_payments + 1))
+        flows[:, 0] = -face_values
+        np.add(annuity, bidrag_paid, out=flows[:, 1:])
+
+        guess = (interests + bidrags) / n_terms
+        ytm = 1 / _newton_discount_grid(flows, 1 / (1 + guess)) - 1
+        for idx in np.flatnonzero(np.isnan(ytm)):
+            ytm[idx] = cls.irr_cashflow(flows[idx])
+
+        return pd.DataFrame(
+            {
+                "Face value": face_values,
+                "Interest": interests,
+                "Bidrag": bidrags,
+                "Yield to maturity": ytm,
+                "Total cost": flows[:, 1:].sum(axis=1),
+                "Total interest": interest.sum(axis=1) + bidrag_paid.sum(axis=1),
+            }
+        )
+
+    @classmethod
+    def batch(
+        cls,
+        prices,
+        face_values,
+        interests,
+        bidrags,
+        maturity: int = 30,
+        n_terms: int = 4,
+    ) -> pd.DataFrame:
+        """
+        Calculate yield to maturity, total cost and total interest for many loans
+        at once, where the loan amounts are adjusted by the bond prices as in
+        from_price. The inputs are broadcast against each other as in from_grid.
+
+        Parameters
+        ----------
+        prices : array_like
+            The prices of the bonds in the market in hundreds e.g. 99.4
+        face_values : array_like
+            The amounts of money you want to borrow
+        interests : array_like
+            The interest rates of the loans, as decimals. E.g. 5% would be 0.05
+        bidrags : array_like
+            Bidrag is interest paid to the bank. Should be annual interest.
+        maturity : int
+            The time to maturity. E.g. 30 for 30 years
+        n_terms : int
+            The number of payments made for each term. E.g. if the loan is for 30 years
+            and payments are made each quarter, then n_paymens should 4. NB: It is not
+            the total number of payments made during the lifetime of the annuity!
+
+        Returns
+        -------
+        pd.DataFrame
+            One row for each loan with its price, loan amount, interest, bidrag,
+            yield to maturity, total cost and total interest
+        """
+        prices, face_values, interests, bidrags = (
+            np.asarray(arr, dtype=np.float64).ravel()
+            for arr in np.broadcast_arrays(prices, face_values, interests, bidrags)
         )
 
+        # Adjust loan amounts by bond prices
+        loan_amounts = face_values / (prices / 100)
+
+        result = cls.from_grid(loan_amounts, interests, bidrags, maturity, n_terms)
+        result.insert(0, "Price", prices)
+        return result
+
     @staticmethod
-    def _add_bidrag(table: pd.DataFrame, bidrag: float, n_terms: int) -> pd.DataFrame:
+    def _add_bidrag(amort_table: AmortTable, bidrag: float, n_terms: int) -> AmortTable:
         """
-        Adjust an amortization table by adding bidrag.
+        Adjust an amortization table by adding bidrag. The given table is not
+        modified.
 
         Parameters
         ----------
-        table : pd.DataFrame
-            Table from dkrk.annuity.Annuity showing amortization
+        amort_table : AmortTable
+            Amortization from dkrk.annuity.Annuity
         bidrag : float
             Bidrag is interest paid to the bank. Should be annual interest.
         n_terms : int
@@ -194,44 +555,109 @@ class TKLoan:
 
         Returns
         -------
-        pd.DataFrame
+        AmortTable
             Adjusted amortization table with bidrag added
         """
-        table["Bidrag"] = (table["Repayment"] + table["Debt"]) * bidrag / n_terms
-        table["Annuity"] = table["Annuity"] + table["Bidrag"]
-        return table
+        factor = bidrag / n_terms
+        # Both new columns share one allocation and are computed in place
+        bidrag_paid, annuity = np.empty((2, len(amort_table.annuity)))
+        np.add(amort_table.repayment, amort_table.debt, out=bidrag_paid)
+        np.multiply(bidrag_paid, factor, out=bidrag_paid)
+        np.add(amort_table.annuity, bidrag_paid, out=annuity)
+        return replace(amort_table, annuity=annuity, bidrag=bidrag_paid)
 
     @property
+    def table(self) -> pd.DataFrame:
+        """
+        Table showing annuities, amortization and bidrag. A new table is created
+        on each access, so editing it does not affect the loan.
+        """
+        return self.amort_table.to_dataframe(self.dtype)
+
+    @cached_property
     def yield_to_maturity(self):
         """
         Calculate the yield to maturity
         """
-        return TKLoan.irr_cashflow(self.cash_flow)
+        if self.bidrag == 0:
+            # Without bidrag all payments equal the annuity, so the annuity
+            # formula can be solved directly instead of the cash flow polynomial
+            rate = _annuity_yield(
+                self.face_value,
+                float(self.amort_table.annuity[0]),
+                len(self.amort_table.annuity),
+                guess=self.interest / self.n_terms,
+            )
+            if not np.isnan(rate):
+                return rate
+        return TKLoan.irr_cashflow(
+            self.cash_flow, guess=(self.interest + self.bidrag) / self.n_terms
+        )
 
     @staticmethod
-    def irr_cashflow(flow):
-        roots = polyroots(flow)
-        real_roots = np.real(roots[np.isreal(roots)])
-        positive_roots = real_roots[real_roots > 0]
-        assert len(positive_roots) == 1
-
-        rate = 1 / positive_roots[0] - 1
+    def irr_cashflow(
+        flow: np.ndarray, guess: float = None, method: str = "newton"
+    ) -> float:
+        """
+        Calculate the internal rate of return per term of a cash flow, where the
+        first element is the (negative) amount received and the following
+        elements are the payments made each term.
 
-        return rate
+        Parameters
+        ----------
+        flow : np.ndarray
+            The cash flow, e.g. TKLoan.cash_flow. Other array likes are
+            converted to a float64 array.
+        guess : float
+            Starting point for the rate. E.g. interest plus bidrag per term. If
+            not given, it is approximated from the average payment.
+        method : str
+            "newton" solves level payments directly from the annuity formula and
+            other flows by Newton iteration on the cash flow polynomial.
+            "robust" computes all roots of the cash flow polynomial, which is
+            much slower but can be used for validation.
 
-    @property
+        Returns
+        -------
+        float
+            The rate per term
+        """
+        flow = np.asarray(flow, dtype=np.float64)
+        if method == "robust":
+            return _polyroots_yield(flow)
+        if method != "newton":
+            raise ValueError(f"Unknown method: {method}")
+
+        principal = -flow[0]
+        payments = flow[1:]
+        if (payments == payments[0]).all():
+            rate = _annuity_yield(principal, payments[0], len(payments), guess)
+            if not np.isnan(rate):
+                return rate
+
+        if guess is None:
+            guess = _annuity_yield_guess(principal, payments.mean(), len(payments))
+        discount = _newton_discount(flow, 1 / (1 + guess))
+        if np.isnan(discount):
+            return _polyroots_yield(flow)
+
+        return 1 / discount - 1
+
+    @cached_property
     def total_cost(self) -> float:
         """
         The total cost of the loan, which is the sum of all annuities
         """
-        return self.table["Annuity"].sum()
+        return self.cash_flow[1:].sum()
 
-    @property
+    @cached_property
     def total_interest(self) -> float:
         """
         The total interest paid on the loan during the whole lifetime
         """
-        return self.table["Interest"].sum() + self.table["Bidrag"].sum()
+        interest = self.amort_table.interest.sum()
+        bidrag = self.amort_table.bidrag.sum()
+        return interest + bidrag
 
     def table_after_tax(self, tax_rate: float) -> pd.DataFrame:
         """
@@ -242,13 +668,14 @@ class TKLoan:
         tax_rate : float
             The tax rate rebate for interest payments in decimal.
         """
-        after_tax = self.table.copy()
-        after_tax["Interest"] = after_tax["Interest"] * (1 - tax_rate)
-        after_tax["Bidrag"] = after_tax["Bidrag"] * (1 - tax_rate)
-        after_tax["Annuity"] = (
-            after_tax["Repayment"] + after_tax["Interest"] + after_tax["Bidrag"]
-        )
-        return after_tax
+        interest = self.amort_table.interest * (1 - tax_rate)
+        bidrag = self.amort_table.bidrag * (1 - tax_rate)
+        return replace(
+            self.amort_table,
+            annuity=self.amort_table.repayment + interest + bidrag,
+            interest=interest,
+            bidrag=bidrag,
+        ).to_dataframe(self.dtype)
 
 
 class LoanPlotter:
@@ -257,19 +684,23 @@ class LoanPlotter:
         self.loans = args
 
     def _concat_tables(self) -> pd.DataFrame:
-        concat_list = []
-        for loan in self.loans:
-            cur_df = loan.table.copy()
-            cur_df[
-                "Loan"
-            ] = f"{loan.interest*100:.2f}% {loan.maturity}Y {loan.bidrag*100:.2f}%"
-            concat_list.append(cur_df)
-        return pd.concat(concat_list)
+        labels = [
+            f"{loan.interest*100:.2f}% {loan.maturity}Y {loan.bidrag*100:.2f}%"
+            for loan in self.loans
+        ]
+        # Loans with identical parameters share a label and thus a category
+        codes, categories = pd.factorize(np.array(labels))
+        tables = [loan.table for loan in self.loans]
+        df = pd.concat(tables)
+        df["Loan"] = pd.Categorical.from_codes(
+            np.repeat(codes, [len(table) for table in tables]),
+            categories=categories,
+        )
+        return df
 
     def plot(self, attribute: str):
-        fig = px.line(
-            self._concat_tables(), x="Time", y=attribute, color="Loan", title=attribute
-        )
+        df = self._concat_tables()
+        fig = px.line(df, x=df.index, y=attribute, color="Loan", title=attribute)
         fig.show()
 
     def plot_debt(self):
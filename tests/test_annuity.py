@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dkrk.annuity import (
+    AmortTable,
+    Annuity,
+    configure_display,
+    _fill_annuity_arrays_loop,
+    _fill_annuity_arrays_numpy,
+)
+
+
+def _fill(fill, principal, rate, n_payments):
+    arrays = np.empty((4, n_payments))
+    fill(principal, rate, *arrays)
+    return arrays
+
+
+@pytest.mark.parametrize("rate", [0.05 / 4, 0.001, 1e-12, 0.0])
+@pytest.mark.parametrize("n_payments", [1, 12, 120])
+def test_fill_annuity_arrays_loop_matches_numpy(rate, n_payments):
+    loop = _fill(_fill_annuity_arrays_loop, 1e6, rate, n_payments)
+    numpy = _fill(_fill_annuity_arrays_numpy, 1e6, rate, n_payments)
+    np.testing.assert_allclose(loop, numpy, rtol=1e-9, atol=1e-6)
+
+
+def test_amort_table_repays_principal():
+    table = Annuity.calc_annuity_table(1e6, 0.05, 30, 4)
+    assert table["Repayment"].sum() == pytest.approx(1e6)
+    assert table["Debt"].iloc[-1] == pytest.approx(0, abs=1e-6)
+    np.testing.assert_allclose(
+        table["Annuity"], table["Repayment"] + table["Interest"]
+    )
+
+
+def test_calc_annuity_accepts_arrays():
+    rates = np.array([0.01, 0.02, 0.0])
+    annuities = Annuity.calc_annuity(1e6, rates, 120)
+    expected = [Annuity.calc_annuity(1e6, rate, 120) for rate in rates]
+    np.testing.assert_allclose(annuities, expected)
+    assert annuities[-1] == pytest.approx(1e6 / 120)
+    np.testing.assert_allclose(
+        Annuity.calc_annuity(np.array([1e6, 2e6]), 0.01, 120),
+        [expected[0], 2 * expected[0]],
+    )
+
+
+@pytest.mark.parametrize("rate", [0.05 / 4, 0.001, 0.0])
+def test_calc_annuity_matches_formula(rate):
+    if rate == 0:
+        expected = 1e6 / 120
+    else:
+        expected = 1e6 * rate / (1 - (1 + rate) ** -120)
+    assert Annuity.calc_annuity(1e6, rate, 120) == pytest.approx(expected, rel=1e-6)
+
+
+def test_import_keeps_pandas_options():
+    code = (
+        "import pandas as pd; defaults = pd.get_option('display.max_rows'); "
+        "import dkrk.annuity, dkrk.realestate; "
+        "assert pd.get_option('display.max_rows') == defaults; "
+        "assert pd.get_option('display.float_format') is None"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+def test_configure_display():
+    with pd.option_context("display.max_rows", 60, "display.float_format", None):
+        configure_display()
+        assert pd.get_option("display.max_rows") == 1000
+        assert pd.get_option("display.float_format")(1.23456) == "1.235"
+
+
+def test_amort_table_compares_by_identity():
+    arrays = [np.ones(3) for _ in range(4)]
+    table = AmortTable(*arrays)
+    assert table == table
+    assert table != AmortTable(*arrays)
+    assert hash(table) == hash(table)
+    assert all(arr.flags.writeable for arr in arrays)
@@ -0,0 +1,260 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from dkrk.realestate import (
+    LoanPlotter,
+    Maturity,
+    Month,
+    Quarter,
+    TKLoan,
+    _add_months,
+    _poly_roots,
+)
+
+
+@pytest.mark.parametrize(
+    "flow",
+    [
+        np.r_[-1e6, np.full(120, 10_000.0)],
+        np.r_[-1000, 120, 90, 500, 400],
+        TKLoan(1e6, 0.05, 0.0074).cash_flow,
+    ],
+)
+def test_irr_cashflow_newton_matches_robust(flow):
+    newton = TKLoan.irr_cashflow(flow)
+    robust = TKLoan.irr_cashflow(flow, method="robust")
+    assert newton == pytest.approx(robust, rel=1e-9, abs=1e-12)
+
+
+def test_irr_cashflow_unknown_method():
+    with pytest.raises(ValueError):
+        TKLoan.irr_cashflow([-100, 60, 60], method="secant")
+
+
+@pytest.mark.parametrize(
+    "flow",
+    [
+        np.r_[-1e6, np.linspace(10_000, 10_000.09, 120)],
+        np.r_[-1e6, 10_000.09, np.full(119, 10_000.0)],
+    ],
+)
+def test_irr_cashflow_nearly_level_flow(flow):
+    newton = TKLoan.irr_cashflow(flow)
+    robust = TKLoan.irr_cashflow(flow, method="robust")
+    assert newton == pytest.approx(robust, rel=1e-9)
+
+
+def test_concat_tables_stacks_all_loans():
+    loans = [TKLoan(1e6, 0.05, 0.0074, maturity=10), TKLoan(1e6, 0.03, 0.0074)]
+    df = LoanPlotter(*loans)._concat_tables()
+    assert len(df) == sum(len(loan.table) for loan in loans)
+    expected = pd.concat([loan.table for loan in loans])
+    pd.testing.assert_frame_equal(df.drop(columns="Loan"), expected)
+
+
+@pytest.mark.parametrize(
+    "date, expected",
+    [
+        (datetime(2023, 1, 15), datetime(2023, 3, 31)),
+        (datetime(2023, 3, 31), datetime(2023, 6, 30)),
+        (datetime(2023, 12, 30), datetime(2023, 12, 31)),
+        (datetime(2023, 12, 31), datetime(2024, 3, 31)),
+        (datetime(2023, 12, 31, 12), datetime(2024, 3, 31)),
+    ],
+)
+def test_next_due_date(date, expected):
+    assert Maturity.next_due_date(date) == expected
+
+
+def test_due_dates_roll_over_year_end():
+    maturity = Maturity(relativedelta(years=1), datetime(2023, 12, 31))
+    assert maturity.due_dates() == [
+        datetime(2024, 3, 31),
+        datetime(2024, 6, 30),
+        datetime(2024, 9, 30),
+        datetime(2024, 12, 31),
+    ]
+
+
+def test_due_dates_from_december():
+    maturity = Maturity(relativedelta(months=6), datetime(2023, 12, 15))
+    assert maturity.due_dates() == [
+        datetime(2023, 12, 31),
+        datetime(2024, 3, 31),
+    ]
+
+
+def test_tables_are_indexed_by_time():
+    loans = [TKLoan(1e6, 0.05, 0.0074, maturity=10), TKLoan(1e6, 0.03, 0.0074)]
+    for loan in loans:
+        pd.testing.assert_index_equal(
+            loan.table.index, pd.RangeIndex(1, 4 * loan.maturity + 1, name="Time")
+        )
+    df = LoanPlotter(*loans)._concat_tables()
+    assert df.index.name == "Time"
+    np.testing.assert_array_equal(df.index, np.r_[1:41, 1:121])
+
+
+def test_table_after_tax():
+    loan = TKLoan(1e6, 0.05, 0.0074)
+    table = loan.table
+    after_tax = loan.table_after_tax(0.3)
+    pd.testing.assert_series_equal(after_tax["Interest"], table["Interest"] * 0.7)
+    pd.testing.assert_series_equal(after_tax["Bidrag"], table["Bidrag"] * 0.7)
+    pd.testing.assert_series_equal(after_tax["Repayment"], table["Repayment"])
+    pd.testing.assert_series_equal(after_tax["Debt"], table["Debt"])
+    pd.testing.assert_series_equal(
+        after_tax["Annuity"],
+        table["Repayment"] + after_tax["Interest"] + after_tax["Bidrag"],
+        check_names=False,
+    )
+    pd.testing.assert_frame_equal(loan.table, table)
+
+
+def test_from_grid_matches_tkloan():
+    face_values = [1e6, 2e6]
+    interests = [0.0, 0.03, 0.05]
+    bidrags = [0.0, 0.0074]
+    grid = TKLoan.from_grid(
+        np.reshape(face_values, (-1, 1, 1)),
+        np.reshape(interests, (1, -1, 1)),
+        np.reshape(bidrags, (1, 1, -1)),
+        maturity=20,
+    )
+    assert len(grid) == len(face_values) * len(interests) * len(bidrags)
+    for _, row in grid.iterrows():
+        loan = TKLoan(row["Face value"], row["Interest"], row["Bidrag"], maturity=20)
+        assert row["Yield to maturity"] == pytest.approx(
+            loan.yield_to_maturity, rel=1e-9, abs=1e-12
+        )
+        assert row["Total cost"] == pytest.approx(loan.total_cost)
+        assert row["Total interest"] == pytest.approx(loan.total_interest)
+
+
+def test_float32_loan_matches_float64():
+    loan32 = TKLoan(1e6, 0.05, 0.0074, dtype=np.float32)
+    loan64 = TKLoan(1e6, 0.05, 0.0074)
+    assert loan32.total_cost == loan64.total_cost
+    assert loan32.total_interest == loan64.total_interest
+    assert loan32.yield_to_maturity == loan64.yield_to_maturity
+    assert (loan32.table.dtypes == np.float32).all()
+    assert (loan32.table_after_tax(0.3).dtypes == np.float32).all()
+
+
+def test_concat_tables_labels_loans_by_category():
+    loans = [
+        TKLoan(1e6, 0.05, 0.0074, maturity=10),
+        TKLoan(1e6, 0.03, 0.0074),
+        TKLoan(2e6, 0.05, 0.0074, maturity=10),
+    ]
+    df = LoanPlotter(*loans)._concat_tables()
+    assert isinstance(df["Loan"].dtype, pd.CategoricalDtype)
+    assert list(df["Loan"].cat.categories) == [
+        "5.00% 10Y 0.74%",
+        "3.00% 30Y 0.74%",
+    ]
+    # Loans with identical parameters share a label
+    assert (df["Loan"].iloc[:40] == "5.00% 10Y 0.74%").all()
+    assert (df["Loan"].iloc[40:160] == "3.00% 30Y 0.74%").all()
+    assert (df["Loan"].iloc[160:] == "5.00% 10Y 0.74%").all()
+
+
+@pytest.mark.parametrize(
+    "date",
+    [
+        datetime(2023, 1, 31),
+        datetime(2023, 8, 31),
+        datetime(2023, 12, 31),
+        datetime(2024, 2, 29),
+        datetime(2023, 5, 15, 10, 30),
+    ],
+)
+@pytest.mark.parametrize("months", [0, 1, 3, 11, 12, 13, 25, -1, -14])
+def test_add_months_matches_relativedelta(date, months):
+    assert _add_months(date, months) == date + relativedelta(months=months)
+
+
+def test_month_next_term():
+    term = Month(datetime(2023, 1, 31), datetime(2023, 2, 28)).next_term()
+    assert isinstance(term, Month)
+    assert (term.start, term.end) == (datetime(2023, 2, 28), datetime(2023, 3, 28))
+
+
+def test_quarter_next_term():
+    term = Quarter(datetime(2023, 10, 1), datetime(2023, 12, 31)).next_term()
+    assert isinstance(term, Quarter)
+    assert (term.start, term.end) == (datetime(2024, 1, 1), datetime(2024, 3, 31))
+    term = term.next_term()
+    assert isinstance(term, Quarter)
+    assert (term.start, term.end) == (datetime(2024, 4, 1), datetime(2024, 6, 30))
+
+
+def test_batch_matches_from_price():
+    batch = TKLoan.batch([95.0, 99.4], 1e6, 0.04, 0.0074)
+    for _, row in batch.iterrows():
+        loan = TKLoan.from_price(row["Price"], 1e6, 0.04, 0.0074)
+        assert row["Face value"] == pytest.approx(loan.face_value)
+        assert row["Yield to maturity"] == pytest.approx(loan.yield_to_maturity)
+        assert row["Total cost"] == pytest.approx(loan.total_cost)
+        assert row["Total interest"] == pytest.approx(loan.total_interest)
+
+
+def test_editing_table_does_not_affect_loan():
+    loan = TKLoan(1e6, 0.05, 0.0074)
+    total_cost = loan.total_cost
+    table = loan.table
+    table.iloc[0, 0] = 5.0
+    assert table.iloc[0, 0] == 5.0
+    assert loan.table.iloc[0, 0] == loan.amort_table.annuity[0] != 5.0
+    assert loan.table["Annuity"].sum() == pytest.approx(total_cost)
+    assert not loan.amort_table.annuity.flags.writeable
+    assert not loan.amort_table.bidrag.flags.writeable
+    assert not loan.cash_flow.flags.writeable
+
+
+def test_yield_to_maturity_without_bidrag():
+    loan = TKLoan(1e6, 0.05, 0.0)
+    assert loan.yield_to_maturity == pytest.approx(0.05 / 4)
+    assert TKLoan(1e6, 0.0, 0.0).yield_to_maturity == 0.0
+
+
+@pytest.mark.parametrize(
+    "flow", [np.r_[-100, 1, 1], np.r_[-1e6, np.full(120, 100.0)], np.r_[-10, 50, 50]]
+)
+def test_irr_cashflow_level_flow_falls_back(flow):
+    newton = TKLoan.irr_cashflow(flow)
+    robust = TKLoan.irr_cashflow(flow, method="robust")
+    assert np.isfinite(newton)
+    assert newton == pytest.approx(robust, rel=1e-9)
+
+
+@pytest.mark.parametrize(
+    "coeffs",
+    [
+        [1.0, 2.0],
+        [-2.0, 1.0, 1.0],
+        [1.0, 0.0, 1.0],
+        [5.0, -4.0, 1.0],
+        [0.0, 0.0, 1.0],
+        [-110.0, 100.0, 0.0],
+        [-1000, 120, 90, 500, 400],
+    ],
+)
+def test_poly_roots_matches_np_roots(coeffs):
+    coeffs = np.array(coeffs, dtype=np.float64)
+    roots = np.sort_complex(_poly_roots(coeffs))
+    expected = np.sort_complex(np.roots(np.trim_zeros(coeffs, "b")[::-1]))
+    np.testing.assert_allclose(roots, expected, atol=1e-12)
+
+
+def test_poly_roots_constant():
+    assert len(_poly_roots(np.array([3.0, 0.0, 0.0]))) == 0
+
+
+def test_irr_cashflow_robust_without_positive_root():
+    with pytest.raises(ValueError):
+        TKLoan.irr_cashflow([1.0, 0.0, 1.0], method="robust")